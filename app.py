@@ -4,13 +4,20 @@
 # import folium.map
 import streamlit as st  # For building the web app interface
 import pandas as pd  # For working with tabular data
+import numpy as np  # For fast array operations on the data
 import folium  # For creating interactive maps
 from streamlit_folium import st_folium  # For displaying folium maps inside Streamlit
+from folium.plugins import FastMarkerCluster  # For rendering many markers client-side
 import geopandas as gpd  # For working with geospatial data (shapefiles, etc.)
 from geodatasets import get_path  # for borough shapes
 import plotly.express as px
 import requests
+from requests.adapters import HTTPAdapter
+import polyline  # For decoding compact encoded route geometries
+import orjson  # Fast JSON parsing for routing responses
 import json
+import os
+from scipy.spatial import cKDTree  # For fast nearest-hotspot lookups
 from streamlit_geolocation import streamlit_geolocation
 
 
@@ -84,28 +91,6 @@ st.markdown(
 # fig: Plotly figure object for the bar chart of hotspot counts by borough.
 
 
-# ===============================
-# Load the dataset
-# ===============================
-df = pd.read_csv(
-    "NYC_Wi-Fi_Hotspot_Locations_20250703.csv"
-)  # Make sure the file is in the same folder as app.py
-
-# Get a list of column headings
-print(df.columns.tolist())
-
-# ===============================
-# Clean and prepare data
-# ===============================
-# Drop rows missing coordinates
-df = df.dropna(subset=["Latitude", "Longitude"])
-
-# Convert lat/lon to numeric (safety)
-df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
-df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
-
-st.subheader("Find Your Wi-Fi Hotspot in NYC")
-
 # Choose columns to display
 columns_to_show = [
     "Provider",
@@ -119,6 +104,237 @@ columns_to_show = [
     "Location (Lat, Long)",
 ]
 
+# Map borough codes to names
+borough_code_to_name = {
+    1: "Manhattan",
+    2: "Bronx",
+    3: "Brooklyn",
+    4: "Queens",
+    5: "Staten Island",
+}
+
+
+# ===============================
+# Load the dataset
+# ===============================
+@st.cache_data
+def load_hotspots(path):
+    """
+    Load and clean the hotspot CSV once; cached so Streamlit reruns
+    (every widget interaction) don't re-parse the file. The cleaned
+    frame is persisted next to the CSV as Parquet, so cold starts after
+    the first one skip CSV parsing and cleaning entirely.
+
+    Returns the cleaned DataFrame together with the per-borough hotspot
+    counts, which are static per dataset.
+    """
+    # Prefer the pre-typed, columnar Parquet sidecar when it exists
+    parquet_path = path.replace(".csv", ".parquet")
+    if os.path.exists(parquet_path):
+        return _with_borough_summary(pd.read_parquet(parquet_path))
+
+    # Only parse the columns the app actually uses, with explicit narrow
+    # dtypes; the multi-threaded pyarrow engine is much faster than the
+    # default parser. Make sure the file is in the same folder as app.py
+    df = pd.read_csv(
+        path,
+        usecols=columns_to_show + ["Latitude", "Longitude", "BoroCode"],
+        dtype={
+            "Provider": "string",
+            "Name": "string",
+            "Location": "string",
+            "Location_T": "string",
+            "SSID": "string",
+            "Borough Name": "string",
+            "Neighborhood Tabulation Area (NTA)": "string",
+            "Postcode": "string",
+            "Location (Lat, Long)": "string",
+            "BoroCode": "Int8",
+        },
+        engine="pyarrow",
+    )
+
+    # Get a list of column headings (printed once, on the first load)
+    print(df.columns.tolist())
+
+    # Drop rows missing coordinates
+    df = df.dropna(subset=["Latitude", "Longitude"])
+
+    # Convert lat/lon to numeric (safety); float32 is plenty of precision
+    # for map display and halves the memory of the coordinate columns
+    df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce").astype("float32")
+    df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce").astype("float32")
+
+    # Default table order: ascending postal codes
+    df = df.sort_values("Postcode", ascending=True)
+
+    # One lowercase "haystack" string per row so the "All" search is a
+    # single column scan instead of one scan per display column
+    df["_search_blob"] = (
+        df[columns_to_show].astype("string").fillna("").agg(" ".join, axis=1)
+    ).str.lower()
+
+    # Highly repetitive columns become categoricals: a small integer code
+    # per row plus one shared table of values, which shrinks memory and
+    # speeds up value_counts/unique/comparison ops
+    for col in ["Provider", "Location_T", "Borough Name", "SSID", "BoroCode"]:
+        df[col] = df[col].astype("category")
+
+    # Persist the cleaned frame for the next cold start
+    df.to_parquet(parquet_path, compression="zstd")
+
+    return _with_borough_summary(df)
+
+
+def _with_borough_summary(df):
+    """
+    Pair the hotspot frame with its per-borough count table, so the
+    summary is computed once in the cached loader instead of on every
+    rerun.
+    """
+    counts = (
+        df["BoroCode"]
+        .value_counts()
+        .rename_axis("Borough Code")
+        .reset_index(name="Number of Hotspots")
+    )
+    counts["Borough Name"] = counts["Borough Code"].map(borough_code_to_name)
+    borough_summary = counts[["Borough Code", "Borough Name", "Number of Hotspots"]]
+    return df, borough_summary
+
+
+@st.cache_resource
+def borough_bar_chart(_summary, counts_key):
+    """
+    Bar chart of hotspot counts per borough, built once per dataset.
+    Plotly figure construction is surprisingly heavy for a static
+    five-row chart, so the figure object is cached and reused.
+    """
+    fig = px.bar(
+        _summary,
+        x="Borough Name",
+        y="Number of Hotspots",
+        labels={"Borough Name": "Borough", "Number of Hotspots": "Hotspot Count"},
+        text="Number of Hotspots",
+    )
+    fig.update_layout(xaxis_tickangle=0)  # 0 means horizontal labels
+    return fig
+
+
+@st.cache_resource
+def suggestion_lists(_df, cols):
+    """
+    Unique values per searchable column, plus a combined "All" list,
+    computed once per dataset instead of on every rerun. Each list is
+    stored ready for the search selectbox, with the leading empty
+    option included, so a rerun doesn't even rebuild the options list.
+    cache_resource hands back the same (never-mutated) lists rather
+    than deep-copying them per rerun as cache_data would.
+
+    _df is underscore-prefixed so Streamlit keys the cache on the column
+    tuple rather than hashing the whole DataFrame each rerun.
+    """
+    suggestions = {}
+    for col in cols:
+        if isinstance(_df[col].dtype, pd.CategoricalDtype):
+            # The categories table already holds the unique values,
+            # so no rescan of the column is needed
+            values = _df[col].cat.categories.astype(str).tolist()
+        else:
+            values = _df[col].dropna().astype(str).unique().tolist()
+        suggestions[col] = [""] + values
+    # Flat numpy concatenation skips the Series construction and index
+    # alignment that pd.concat would do just to feed pd.unique
+    suggestions["All"] = [""] + pd.unique(
+        np.concatenate([_df[col].astype(str).to_numpy() for col in cols])
+    ).tolist()
+    return suggestions
+
+
+@st.cache_resource
+def lowercase_columns(_df, cols):
+    """
+    Lowercased string copies of the searchable columns, built once per
+    dataset. Searching compares plain literals against these instead of
+    running case-insensitive matching over the originals each time.
+    """
+    return {col: _df[col].astype("string").str.lower() for col in cols}
+
+
+@st.cache_data(show_spinner=False)
+def filter_positions(_df, search, selected_column):
+    """
+    Positional indices of the rows matching a search, memoized per
+    (search, column) pair so unrelated reruns (button clicks, map
+    interactions) don't re-filter the frame. Returns a small int array
+    instead of a DataFrame to keep cache copies cheap.
+    """
+    if selected_column == "All":
+        # Single scan over the precomputed lowercase haystack column
+        # instead of one scan per display column
+        mask = _df["_search_blob"].str.contains(search.lower(), regex=False, na=False)
+    else:
+        col_lower = lowercase_columns(_df, tuple(columns_to_show))[selected_column]
+        mask = col_lower.str.contains(search.lower(), regex=False, na=False)
+    return np.flatnonzero(mask.to_numpy())
+
+
+@st.cache_resource
+def build_latlon_index(_df):
+    """
+    Quantized (lat, lon) -> row positions map, built once per dataset.
+    Looking up a clicked hotspot becomes an O(1) dict hit instead of a
+    boolean scan with two float comparisons per row, and quantizing to
+    1e-6 degrees sidesteps float-equality fragility.
+    """
+    lat_keys = np.round(_df["Latitude"].to_numpy(dtype="float64") * 1e6).astype(
+        "int64"
+    )
+    lon_keys = np.round(_df["Longitude"].to_numpy(dtype="float64") * 1e6).astype(
+        "int64"
+    )
+    index = {}
+    for pos, key in enumerate(zip(lat_keys.tolist(), lon_keys.tolist())):
+        index.setdefault(key, []).append(pos)
+    return index
+
+
+def latlon_key(lat, lon):
+    """Quantize coordinates the same way as build_latlon_index."""
+    return (int(round(lat * 1e6)), int(round(lon * 1e6)))
+
+
+@st.cache_resource
+def build_match_map(_df):
+    """
+    (Location, SSID) -> row labels map, built once per dataset. Resolving
+    the table-selected hotspot becomes a dict hit instead of two string
+    comparisons against every displayed row.
+    """
+    match_map = {}
+    for label, loc, ssid in zip(
+        _df.index.tolist(),
+        _df["Location"].astype(str).tolist(),
+        _df["SSID"].astype(str).tolist(),
+    ):
+        match_map.setdefault((loc, ssid), []).append(label)
+    return match_map
+
+
+@st.cache_resource
+def build_hotspot_tree(_df):
+    """
+    KD-tree over the hotspot coordinates, built once per dataset.
+    Nearest-hotspot queries become O(log N) tree walks instead of a
+    linear scan over every row in Python.
+    """
+    return cKDTree(_df[["Latitude", "Longitude"]].to_numpy())
+
+
+df, borough_summary = load_hotspots("NYC_Wi-Fi_Hotspot_Locations_20250703.csv")
+
+st.subheader("Find Your Wi-Fi Hotspot in NYC")
+
 # Create a mapping from old column names to new, user-friendly names
 column_rename_map = {
     "Provider": "Provider",
@@ -132,84 +348,165 @@ column_rename_map = {
     "Location (Lat, Long)": "Coordinates",
 }
 
-# Set the default to the table arranging rows in ascending order of postal codes
-df = df.sort_values("Postcode", ascending=True)
-
+# Inverse mapping from display names back to original column names,
+# built once instead of on every rerun
+display_to_original = {v: k for k, v in column_rename_map.items()}
 
 # ===============================
 # Routing Functions
 # ===============================
+@st.cache_resource
+def get_session():
+    """
+    Shared HTTP session with connection pooling, built once per process.
+    Streamlit re-executes the script on every rerun, so a module-level
+    Session would be reconstructed each time and its keep-alive sockets
+    never reused; caching it keeps the pooled connections alive across
+    reruns.
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    session.headers.update({"User-Agent": "WiFi-NYC/1.0"})
+    return session
+
+
+@st.cache_data(ttl=86400, show_spinner=False)
 def get_directions_ors(start_lat, start_lon, end_lat, end_lon, api_key):
     """
     Get directions using OpenRouteService API
     Returns decoded coordinates for the route
+    Successful responses are cached for a day per coordinate pair, so
+    reruns don't re-fetch the same route; failures raise instead of
+    returning None so a transient error is never pinned for the TTL
     """
-    try:
-        # OpenRouteService API endpoint for directions
-        url = "https://api.openrouteservice.org/v2/directions/foot-walking"
-
-        headers = {
-            "Accept": "application/json, application/geo+json, application/gpx+xml, img/png; charset=utf-8",
-            "Authorization": api_key,
-            "Content-Type": "application/json; charset=utf-8",
-        }
+    # OpenRouteService API endpoint for directions
+    url = "https://api.openrouteservice.org/v2/directions/foot-walking"
 
-        body = {
-            "coordinates": [[start_lon, start_lat], [end_lon, end_lat]],
-            "format": "geojson",
-        }
+    headers = {
+        "Accept": "application/json, application/geo+json, application/gpx+xml, img/png; charset=utf-8",
+        "Authorization": api_key,
+        "Content-Type": "application/json; charset=utf-8",
+    }
 
-        response = requests.post(url, json=body, headers=headers)
+    body = {
+        "coordinates": [[start_lon, start_lat], [end_lon, end_lat]],
+        "format": "geojson",
+    }
 
-        if response.status_code == 200:
-            data = response.json()
-            if "features" in data and len(data["features"]) > 0:
-                # Extract coordinates from the route
-                coordinates = data["features"][0]["geometry"]["coordinates"]
-                # Convert from [lon, lat] to [lat, lon] for folium
-                route_coords = [[coord[1], coord[0]] for coord in coordinates]
-                return route_coords
-        else:
-            st.error(f"Routing API error: {response.status_code}")
-            return None
+    response = get_session().post(url, json=body, headers=headers)
+
+    if response.status_code != 200:
+        raise RuntimeError(f"Routing API error: {response.status_code}")
+
+    data = orjson.loads(response.content)
+    if "features" in data and len(data["features"]) > 0:
+        # Extract coordinates from the route
+        coordinates = data["features"][0]["geometry"]["coordinates"]
+        # Convert from [lon, lat] to [lat, lon] for folium with a
+        # single C-level reverse instead of a per-point Python loop
+        route_coords = np.asarray(coordinates, dtype=np.float64)[:, ::-1].tolist()
+        return route_coords
 
-    except Exception as e:
-        st.error(f"Error getting directions: {str(e)}")
-        return None
+    # A well-formed response with no route is a genuine (cacheable) miss
+    return None
 
 
+@st.cache_data(ttl=86400, show_spinner=False)
 def get_directions_osrm(start_lat, start_lon, end_lat, end_lon):
     """
     Get directions using free OSRM API (no API key required)
     Returns decoded coordinates for the route
+    Successful responses are cached for a day per coordinate pair, so
+    reruns don't re-fetch the same route; failures raise instead of
+    returning None so a transient error is never pinned for the TTL
     """
-    try:
-        # OSRM API endpoint for walking directions
-        url = f"http://router.project-osrm.org/route/v1/foot/{start_lon},{start_lat};{end_lon},{end_lat}"
-
-        params = {"overview": "full", "geometries": "geojson"}
-
-        response = requests.get(url, params=params)
-
-        if response.status_code == 200:
-            data = response.json()
-            if "routes" in data and len(data["routes"]) > 0:
-                # Extract coordinates from the route
-                coordinates = data["routes"][0]["geometry"]["coordinates"]
-                # Convert from [lon, lat] to [lat, lon] for folium
-                route_coords = [[coord[1], coord[0]] for coord in coordinates]
-                return (
-                    route_coords,
-                    data["routes"][0].get("duration", 0),
-                    data["routes"][0].get("distance", 0),
-                )
-        else:
-            st.error(f"Routing API error: {response.status_code}")
-            return None, None, None
+    # OSRM API endpoint for walking directions
+    url = f"http://router.project-osrm.org/route/v1/foot/{start_lon},{start_lat};{end_lon},{end_lat}"
+
+    # polyline6 is a compact ASCII encoding: a fraction of the bytes
+    # of geojson coordinate arrays, and decoding yields (lat, lon)
+    # pairs directly so no lon/lat swap is needed
+    params = {"overview": "full", "geometries": "polyline6"}
+
+    response = get_session().get(url, params=params)
+
+    if response.status_code != 200:
+        raise RuntimeError(f"Routing API error: {response.status_code}")
+
+    data = orjson.loads(response.content)
+    if "routes" in data and len(data["routes"]) > 0:
+        # Decode the route geometry straight to [lat, lon] pairs
+        route_coords = polyline.decode(data["routes"][0]["geometry"], precision=6)
+        return (
+            route_coords,
+            data["routes"][0].get("duration", 0),
+            data["routes"][0].get("distance", 0),
+        )
+
+    # A well-formed response with no route is a genuine (cacheable) miss
+    return None, None, None
 
-    except Exception as e:
-        st.error(f"Error getting directions: {str(e)}")
-        return None, None, None
+
+# ===============================
+# Map layer construction
+# ===============================
+# JS callback that builds each clustered marker client-side, so the bulk
+# of the hotspots is sent to the browser as one array of points instead
+# of 200+ individual folium.Marker objects
+marker_callback = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    var icon = L.AwesomeMarkers.icon({icon: "wifi", prefix: "fa", markerColor: "blue"});
+    marker.setIcon(icon);
+    marker.bindPopup("<b>" + row[2] + "</b><br>SSID: " + row[3] + "<br>Click marker to show only this hotspot");
+    marker.bindTooltip(String(row[3]));
+    return marker;
+}
+"""
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def hotspot_layer_data(_map_data, data_key, highlight_key):
+    """
+    Marker data for a given set of rows: the JSON-ready cluster points
+    and the rows to highlight, keyed on the row ids and the current
+    highlight so reruns that don't change the map contents skip the
+    recompute. Only plain lists are cached -- the folium elements are
+    constructed per rerun, since cached elements would be mutable state
+    shared across sessions (adding a layer to a map re-parents it).
+    max_entries bounds what repeated Refresh clicks can accumulate.
+    """
+    # The highlight key carries the matching row labels (resolved via the
+    # cached match map), so membership against the displayed index is all
+    # that's needed here. (A hotspot selected by map click bypasses this
+    # builder entirely and gets its red marker added directly.)
+    if highlight_key and highlight_key[0] == "table":
+        sel_mask = _map_data.index.isin(highlight_key[1])
+    else:
+        sel_mask = np.zeros(len(_map_data), dtype=bool)
+
+    # Plain Python floats/strings so both the cached payload and the
+    # cluster data serialize cleanly (float32/string-dtype scalars would
+    # not JSON-encode)
+    highlight_rows = [
+        (float(row.Latitude), float(row.Longitude), str(row.Name), str(row.SSID))
+        for row in _map_data.loc[sel_mask].itertuples()
+    ]
+
+    # The bulk renders as one clustered layer
+    bulk = _map_data.loc[~sel_mask]
+    bulk_points = [
+        [float(lat), float(lon), str(name), str(ssid)]
+        for lat, lon, name, ssid in zip(
+            bulk["Latitude"].to_numpy(),
+            bulk["Longitude"].to_numpy(),
+            bulk["Name"].to_numpy(),
+            bulk["SSID"].to_numpy(),
+        )
+    ]
+
+    return bulk_points, highlight_rows
 
 
 # Drop down menu
@@ -223,17 +520,10 @@ with col2:
 if selected_column_display == "All":
     selected_column = "All"
 else:
-    selected_column = {v: k for k, v in column_rename_map.items()}[
-        selected_column_display
-    ]
+    selected_column = display_to_original[selected_column_display]
 
-# Now set suggestions based on the selected column
-if selected_column == "All":
-    all_suggestions = pd.unique(
-        pd.concat([df[col].astype(str) for col in columns_to_show])
-    ).tolist()
-else:
-    all_suggestions = df[selected_column].dropna().astype(str).unique().tolist()
+# Now set suggestions based on the selected column (cached per dataset)
+all_suggestions = suggestion_lists(df, tuple(columns_to_show))[selected_column]
 
 
 # Place this before the selectbox is rendered
@@ -258,29 +548,24 @@ with col1:
     with cols1:
         search = st.selectbox(
             "Search for a hotspot, borough, postcode, etc.",
-            options=[""] + all_suggestions,
+            options=all_suggestions,
             index=0,
             key="search_key",
         )
 
 
 # Filter the DataFrame based on the search query and selected column
+# (memoized per (search, column) pair)
 if search:
-    if selected_column == "All":
-        mask = df[columns_to_show].apply(
-            lambda row: row.astype(str).str.contains(search, case=False).any(), axis=1
-        )
-        filtered_df = df[mask]
-    else:
-        mask = df[selected_column].astype(str).str.contains(search, case=False)
-        filtered_df = df[mask]
+    filtered_df = df.take(filter_positions(df, search, selected_column))
 elif "selected_hotspot" in st.session_state:
-    # Show only the selected hotspot from map click
+    # Show only the selected hotspot from map click (O(1) index lookup)
     selected_hotspot = st.session_state.selected_hotspot
-    filtered_df = df[
-        (df["Latitude"] == selected_hotspot["lat"])
-        & (df["Longitude"] == selected_hotspot["lon"])
-    ]
+    filtered_df = df.take(
+        build_latlon_index(df).get(
+            latlon_key(selected_hotspot["lat"], selected_hotspot["lon"]), []
+        )
+    )
 else:
     filtered_df = df
 
@@ -292,12 +577,15 @@ display_df = filtered_df[columns_to_show].rename(columns=column_rename_map)
 table_col, no_col, map_col = st.columns([8, 1, 6])
 
 with table_col:
-    selected_row = st.data_editor(
+    # Read-only Arrow rendering path; st.data_editor with disabled=True
+    # drags in the editing machinery just to display rows
+    st.dataframe(
         display_df,
         use_container_width=True,
         height=400,
-        disabled=True,
         hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
         key="hotspot_table",
     )
 
@@ -325,7 +613,12 @@ with col4:
 
     with btn_col1:
         if st.button("🔄 Refresh 200 Random Hotspots", key="refresh_button"):
-            st.session_state.hotspot_sample = df.sample(n=200)
+            # Session state only stores the 200 row positions; the rows
+            # themselves are pulled from the cached frame on each rerun
+            rng = np.random.default_rng()
+            st.session_state.hotspot_sample_idx = rng.choice(
+                len(df), size=min(200, len(df)), replace=False
+            )
             st.session_state.refresh_clicked = True
             # Clear any selected hotspot to return to initial state
             if "selected_hotspot" in st.session_state:
@@ -482,59 +775,88 @@ with map_col:
                 icon=folium.Icon(icon="user", prefix="fa", color="red"),
             ).add_to(m)
 
+            # Point out the closest hotspot using the cached KD-tree
+            tree = build_hotspot_tree(df)
+            _, nearest_idx = tree.query([user_lat, user_lon], k=1)
+            nearest = df.iloc[nearest_idx]
+            st.info(
+                f"📶 Nearest hotspot: {nearest['Name']} ({nearest['SSID']}) at {nearest['Location']}"
+            )
+
     # Decide what data to show: selected hotspot, filtered search, or random sample
     if "selected_hotspot" in st.session_state:
-        # Show only the selected hotspot
+        # Show only the selected hotspot (O(1) index lookup)
         selected_hotspot = st.session_state.selected_hotspot
-        map_data = df[
-            (df["Latitude"] == selected_hotspot["lat"])
-            & (df["Longitude"] == selected_hotspot["lon"])
-        ]
+        map_data = df.take(
+            build_latlon_index(df).get(
+                latlon_key(selected_hotspot["lat"], selected_hotspot["lon"]), []
+            )
+        )
     elif search:
         map_data = filtered_df
     else:
-        if "hotspot_sample" not in st.session_state:
-            st.session_state.hotspot_sample = df.sample(n=200, random_state=42)
-        map_data = st.session_state.hotspot_sample
-
-    # Create a FeatureGroup to hold all the WiFi markers
-    hotspot_group = folium.FeatureGroup(name="Hotspots")
+        if "hotspot_sample_idx" not in st.session_state:
+            rng = np.random.default_rng(42)
+            st.session_state.hotspot_sample_idx = rng.choice(
+                len(df), size=min(200, len(df)), replace=False
+            )
+        map_data = df.take(st.session_state.hotspot_sample_idx)
 
     # Get selected row from table (via session state)
-    selected_row = st.session_state.get("hotspot_table", {})
-
-    # Loop over whichever data we're displaying on the map
-    for _, row in map_data.iterrows():
-        # Default marker color
-        color = "blue"
-
-        # Highlight selected hotspot from map click in red
-        if "selected_hotspot" in st.session_state:
-            selected_hotspot = st.session_state.selected_hotspot
-            if (
-                row["Latitude"] == selected_hotspot["lat"]
-                and row["Longitude"] == selected_hotspot["lon"]
-            ):
-                color = "red"
-
-        # Highlight selected row from table in green (if different from map selection)
-        elif selected_row and (
-            row["Location"] == selected_row.get("Address/Location")
-            and row["SSID"] == selected_row.get("WiFi Network (SSID)")
-        ):
-            color = "green"
-
-        # Create and add the marker
-        marker = folium.Marker(
-            location=[row["Latitude"], row["Longitude"]],
-            popup=f"<b>{row.get('Name', 'Unknown')}</b><br>SSID: {row.get('SSID', 'Unknown')}<br>Click marker to show only this hotspot",
-            tooltip=row.get("SSID", ""),
-            icon=folium.Icon(icon="wifi", prefix="fa", color=color),
-        )
-        hotspot_group.add_child(marker)
+    table_state = st.session_state.get("hotspot_table")
+    selected_rows = table_state["selection"]["rows"] if table_state else []
+
+    if "selected_hotspot" in st.session_state:
+        # Single-hotspot view: add the red marker(s) directly, skipping
+        # the cluster layer and cache machinery for one row
+        for row in map_data.itertuples():
+            folium.Marker(
+                location=[row.Latitude, row.Longitude],
+                popup=f"<b>{row.Name}</b><br>SSID: {row.SSID}<br>Click marker to show only this hotspot",
+                tooltip=row.SSID,
+                icon=folium.Icon(icon="wifi", prefix="fa", color="red"),
+            ).add_to(m)
+    else:
+        # Work out what (if anything) is highlighted, as a small hashable
+        # key so the cached layer builder can skip rebuilding when
+        # nothing changed
+        # Streamlit keeps a keyed dataframe's selection when the data
+        # changes, so a row picked in the full table can persist as a
+        # stale positional index after a search shrinks display_df --
+        # discard it rather than crash on (or highlight) the wrong row
+        if selected_rows and selected_rows[0] < len(display_df):
+            # Resolve the selected (Location, SSID) to its row labels with
+            # one dict lookup instead of comparing strings per marker
+            table_row = display_df.iloc[selected_rows[0]]
+            match_labels = build_match_map(df).get(
+                (
+                    str(table_row["Address/Location"]),
+                    str(table_row["WiFi Network (SSID)"]),
+                ),
+                [],
+            )
+            highlight_key = ("table", tuple(match_labels))
+        else:
+            highlight_key = None
 
-    # Add markers to the map
-    m.add_child(hotspot_group)
+        # Fetch the (cached) marker data and build this rerun's folium
+        # elements from it -- the elements themselves are per-map state
+        data_key = tuple(map_data.index.tolist())
+        bulk_points, highlight_rows = hotspot_layer_data(
+            map_data, data_key, highlight_key
+        )
+        if bulk_points:
+            FastMarkerCluster(
+                bulk_points, callback=marker_callback, name="Hotspots"
+            ).add_to(m)
+        for lat, lon, name, ssid in highlight_rows:
+            # Highlight selected row from table in green
+            folium.Marker(
+                location=[lat, lon],
+                popup=f"<b>{name}</b><br>SSID: {ssid}<br>Click marker to show only this hotspot",
+                tooltip=ssid,
+                icon=folium.Icon(icon="wifi", prefix="fa", color="green"),
+            ).add_to(m)
 
     # Add directions if enabled and both locations are available
     if (
@@ -549,9 +871,41 @@ with map_col:
         hotspot_lon = st.session_state.selected_hotspot["lon"]
 
         with st.spinner("🗺️ Getting directions..."):
-            route_coords, duration, distance = get_directions_osrm(
-                user_lat, user_lon, hotspot_lat, hotspot_lon
-            )
+            # Round to ~10 m so tiny GPS jitter still hits the route
+            # cache. Errors are handled here rather than inside the
+            # cached functions, so a transient failure is reported once
+            # and retried on the next rerun instead of being memoized
+            try:
+                route_coords, duration, distance = get_directions_osrm(
+                    round(user_lat, 4),
+                    round(user_lon, 4),
+                    round(hotspot_lat, 4),
+                    round(hotspot_lon, 4),
+                )
+            except Exception as e:
+                st.error(f"Error getting directions: {str(e)}")
+                route_coords, duration, distance = None, None, None
+
+            # Fall back to OpenRouteService when OSRM is unavailable and
+            # an API key is configured in Streamlit secrets
+            if route_coords is None:
+                try:
+                    ors_api_key = st.secrets.get("ors_api_key", "")
+                except FileNotFoundError:
+                    ors_api_key = ""
+                if ors_api_key:
+                    try:
+                        route_coords = get_directions_ors(
+                            round(user_lat, 4),
+                            round(user_lon, 4),
+                            round(hotspot_lat, 4),
+                            round(hotspot_lon, 4),
+                            ors_api_key,
+                        )
+                    except Exception as e:
+                        st.error(f"Error getting directions: {str(e)}")
+                        route_coords = None
+                    duration = distance = None
 
             if route_coords:
                 # Add the route to the map
@@ -582,19 +936,44 @@ with map_col:
             clicked_lat = clicked_data["lat"]
             clicked_lng = clicked_data["lng"]
 
-            # Check if this click is different from current selection
+            # Co-located hotspots get spiderfied by the marker cluster,
+            # which temporarily displaces them from their true
+            # coordinates, so the reported latlng can miss the exact
+            # coordinate index. Snap such clicks to the nearest hotspot
+            # within the spiderfy displacement (~25 px, well under 5e-4
+            # degrees) and ignore clicks that resolve to no hotspot at
+            # all instead of rendering an empty app
+            if latlon_key(clicked_lat, clicked_lng) not in build_latlon_index(df):
+                dist, nearest_pos = build_hotspot_tree(df).query(
+                    [clicked_lat, clicked_lng], k=1
+                )
+                if dist <= 5e-4:
+                    clicked_lat = float(df["Latitude"].iat[nearest_pos])
+                    clicked_lng = float(df["Longitude"].iat[nearest_pos])
+                else:
+                    clicked_lat = None
+
+            # Check if this click is different from the current selection
+            # by comparing coordinates quantized to ~10 m as integers;
+            # st.rerun() replays the entire script, so it only fires when
+            # the clicked marker actually changed
             current_selection = st.session_state.get("selected_hotspot")
-            if (
-                not current_selection
-                or abs(current_selection["lat"] - clicked_lat) > 0.0001
-                or abs(current_selection["lon"] - clicked_lng) > 0.0001
-            ):
-
-                st.session_state.selected_hotspot = {
-                    "lat": clicked_lat,
-                    "lon": clicked_lng,
-                }
-                st.rerun()
+            current_key = (
+                (
+                    int(current_selection["lat"] * 1e4),
+                    int(current_selection["lon"] * 1e4),
+                )
+                if current_selection
+                else None
+            )
+            if clicked_lat is not None:
+                new_key = (int(clicked_lat * 1e4), int(clicked_lng * 1e4))
+                if current_key != new_key:
+                    st.session_state.selected_hotspot = {
+                        "lat": clicked_lat,
+                        "lon": clicked_lng,
+                    }
+                    st.rerun()
 
 
 # Check if we're in fullscreen mode - if so, stop here and don't show the rest
@@ -605,37 +984,13 @@ if st.session_state.get("map_fullscreen", False):
 # ===============================
 # Table showing boroughs and number of hotspots
 # ===============================
-# Count how many times each borough code appears
-borough_counts = df["BoroCode"].value_counts().reset_index()
-borough_counts.columns = ["Borough Code", "Number of Hotspots"]
-
-# Map borough codes to names
-borough_code_to_name = {
-    1: "Manhattan",
-    2: "Bronx",
-    3: "Brooklyn",
-    4: "Queens",
-    5: "Staten Island",
-}
-borough_counts["Borough Name"] = borough_counts["Borough Code"].map(
-    borough_code_to_name
-)
-
-# Reorder columns: Borough Code, Borough Name, Number of Hotspots
-borough_summary = borough_counts[["Borough Code", "Borough Name", "Number of Hotspots"]]
-
-# Show the new DataFrame
+# borough_summary comes precomputed from the cached loader
 st.subheader("Hotspot Count by Borough")
 
-# bar chart using plotly
-fig = px.bar(
-    borough_summary,
-    x="Borough Name",
-    y="Number of Hotspots",
-    labels={"Borough Name": "Borough", "Number of Hotspots": "Hotspot Count"},
-    text="Number of Hotspots",
+# bar chart using plotly (cached, keyed on the counts themselves)
+fig = borough_bar_chart(
+    borough_summary, tuple(borough_summary["Number of Hotspots"])
 )
-fig.update_layout(xaxis_tickangle=0)  # 0 means horizontal labels
 
 st.plotly_chart(fig, use_container_width=True)
 